@@ -98,6 +98,14 @@ async def startup_event():
 async def shutdown_event():
     from app.services.redis_client import close_redis
     await close_redis()
+    from app.services.career_path_synthesis_service import close_http_client
+    await close_http_client()
+    from app.services.perplexity_client import close_http_client as close_perplexity_http_client
+    await close_perplexity_http_client()
+    from app.services.company_research_service import close_probe_session
+    await close_probe_session()
+    from app.services.firecrawl_client import close_http_client as close_firecrawl_http_client
+    await close_firecrawl_http_client()
     logger.info("ResumeAI Backend stopped")
 
 # Health check endpoint - shallow (for Railway routing / load balancer)
@@ -138,6 +146,7 @@ async def health_ready():
         from app.services.gateway import get_gateway
         gw = get_gateway()
         checks["circuits"] = gw.get_circuit_states()
+        checks["concurrency_limits"] = gw.get_concurrency_limits()
     except Exception:
         checks["circuits"] = {}
 
@@ -1,10 +1,13 @@
 """Cover Letter Generation Routes"""
 
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Tuple
 from datetime import datetime
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -12,7 +15,7 @@ from slowapi.util import get_remote_address
 from app.database import get_db, AsyncSessionLocal
 from app.models.cover_letter import CoverLetter
 from app.middleware.auth import get_user_id, ownership_filter
-from app.services.cover_letter_service import generate_cover_letter_content
+from app.services.cover_letter_service import generate_cover_letter_content, stream_cover_letter_content
 from app.utils.logger import get_logger
 
 router = APIRouter()
@@ -105,6 +108,120 @@ async def extract_job_from_url(url: str) -> str:
         raise HTTPException(status_code=400, detail=f"Failed to extract job from URL: {str(e)}")
 
 
+async def _resolve_generation_context(
+    data: GenerateRequest,
+    db: AsyncSession,
+) -> Tuple[str, Optional[dict], Optional[int], Optional[dict]]:
+    """
+    Resolve everything a letter needs besides the request options: the job description
+    (given, from the tailored resume's job, or scraped from job_url), resume context,
+    the base resume id, and Perplexity company research. May set data.company_name
+    when it is detected from job_url. Raises HTTPException(400) when no job description
+    can be found.
+    """
+    from app.models.resume import TailoredResume, BaseResume
+    from app.models.job import Job
+
+    # Normalize job_url: discard any non-HTTP placeholder values (e.g. manual_ IDs
+    # stored by the tailoring route when no real URL was provided). Only treat it
+    # as a real URL if it starts with http:// or https://.
+    effective_job_url = data.job_url
+    if effective_job_url and not (effective_job_url.startswith('http://') or effective_job_url.startswith('https://')):
+        logger.info(f"Ignoring non-HTTP job_url value '{effective_job_url}' - treating as no URL")
+        effective_job_url = None
+
+    # Resolve job_description from tailored resume's Job if not provided directly.
+    # Run this whenever job_description is missing, regardless of whether a URL was
+    # also sent - the URL may be a manual_ placeholder that provides no description.
+    job_description = data.job_description
+    if not job_description and data.tailored_resume_id:
+        tr_result = await db.execute(
+            select(TailoredResume).where(TailoredResume.id == data.tailored_resume_id)
+        )
+        tr = tr_result.scalar_one_or_none()
+        if tr and tr.job_id:
+            job_result = await db.execute(
+                select(Job).where(Job.id == tr.job_id)
+            )
+            job = job_result.scalar_one_or_none()
+            if job and job.description:
+                job_description = job.description
+                logger.info(f"Resolved job description from tailored resume {data.tailored_resume_id}, job {tr.job_id}")
+
+    # Validate that we have a job description from some source
+    if not job_description and not effective_job_url:
+        raise HTTPException(status_code=400, detail="Either job_description or job_url must be provided")
+
+    # Extract job description from URL if provided and we don't already have one
+    if effective_job_url and not job_description:
+        logger.info(f"Extracting job from URL: {effective_job_url}")
+        job_description = await extract_job_from_url(effective_job_url)
+
+        # Auto-detect company from URL if company_name is generic or empty
+        if not data.company_name or data.company_name.lower() in ['company', 'target company']:
+            detected_company = detect_company_from_url(effective_job_url)
+            if detected_company:
+                data.company_name = detected_company
+                logger.info(f"Detected company from URL: {detected_company}")
+
+    if not job_description:
+        raise HTTPException(status_code=400, detail="No job description could be extracted")
+
+    # Fetch resume data if linked
+    resume_context = None
+    resolved_base_resume_id = None
+
+    if data.tailored_resume_id:
+        # Path 1: From a tailored resume (existing behavior)
+        tr_result = await db.execute(
+            select(TailoredResume).where(TailoredResume.id == data.tailored_resume_id)
+        )
+        tr = tr_result.scalar_one_or_none()
+        if tr:
+            resolved_base_resume_id = tr.base_resume_id
+            br_result = await db.execute(
+                select(BaseResume).where(BaseResume.id == tr.base_resume_id)
+            )
+            br = br_result.scalar_one_or_none()
+            if br:
+                resume_context = {
+                    "summary": tr.tailored_summary or br.summary,
+                    "experience": tr.tailored_experience or br.experience,
+                    "skills": tr.tailored_skills or br.skills,
+                    "name": br.candidate_name,
+                }
+    elif data.base_resume_id:
+        # Path 2: From a base (uploaded) resume directly
+        resolved_base_resume_id = data.base_resume_id
+        br_result = await db.execute(
+            select(BaseResume).where(BaseResume.id == data.base_resume_id)
+        )
+        br = br_result.scalar_one_or_none()
+        if br:
+            resume_context = {
+                "summary": br.summary or "",
+                "experience": br.experience or "",
+                "skills": br.skills or "",
+                "name": br.candidate_name,
+            }
+
+    # Research company with Perplexity
+    company_research = None
+    try:
+        from app.services.perplexity_client import PerplexityClient
+        perplexity = PerplexityClient()
+        company_research = await perplexity.research_company(
+            company_name=data.company_name,
+            job_title=data.job_title
+        )
+        logger.info(f"Perplexity research completed for {data.company_name}")
+    except Exception as e:
+        logger.warning(f"Perplexity research failed for {data.company_name}: {e}")
+        company_research = None
+
+    return job_description, resume_context, resolved_base_resume_id, company_research
+
+
 @router.post("/generate")
 @limiter.limit("10/hour")
 async def generate_cover_letter(
@@ -118,105 +235,8 @@ async def generate_cover_letter(
         raise HTTPException(status_code=400, detail=f"Invalid tone. Must be one of: {', '.join(valid_tones)}")
 
     try:
-        from app.models.resume import TailoredResume, BaseResume
-        from app.models.job import Job
-
-        # Normalize job_url: discard any non-HTTP placeholder values (e.g. manual_ IDs
-        # stored by the tailoring route when no real URL was provided). Only treat it
-        # as a real URL if it starts with http:// or https://.
-        effective_job_url = data.job_url
-        if effective_job_url and not (effective_job_url.startswith('http://') or effective_job_url.startswith('https://')):
-            logger.info(f"Ignoring non-HTTP job_url value '{effective_job_url}' - treating as no URL")
-            effective_job_url = None
-
-        # Resolve job_description from tailored resume's Job if not provided directly.
-        # Run this whenever job_description is missing, regardless of whether a URL was
-        # also sent - the URL may be a manual_ placeholder that provides no description.
-        job_description = data.job_description
-        if not job_description and data.tailored_resume_id:
-            tr_result = await db.execute(
-                select(TailoredResume).where(TailoredResume.id == data.tailored_resume_id)
-            )
-            tr = tr_result.scalar_one_or_none()
-            if tr and tr.job_id:
-                job_result = await db.execute(
-                    select(Job).where(Job.id == tr.job_id)
-                )
-                job = job_result.scalar_one_or_none()
-                if job and job.description:
-                    job_description = job.description
-                    logger.info(f"Resolved job description from tailored resume {data.tailored_resume_id}, job {tr.job_id}")
-
-        # Validate that we have a job description from some source
-        if not job_description and not effective_job_url:
-            raise HTTPException(status_code=400, detail="Either job_description or job_url must be provided")
-
-        # Extract job description from URL if provided and we don't already have one
-        if effective_job_url and not job_description:
-            logger.info(f"Extracting job from URL: {effective_job_url}")
-            job_description = await extract_job_from_url(effective_job_url)
-
-            # Auto-detect company from URL if company_name is generic or empty
-            if not data.company_name or data.company_name.lower() in ['company', 'target company']:
-                detected_company = detect_company_from_url(effective_job_url)
-                if detected_company:
-                    data.company_name = detected_company
-                    logger.info(f"Detected company from URL: {detected_company}")
-
-        if not job_description:
-            raise HTTPException(status_code=400, detail="No job description could be extracted")
-
-        # Fetch resume data if linked
-        resume_context = None
-        resolved_base_resume_id = None
-
-        if data.tailored_resume_id:
-            # Path 1: From a tailored resume (existing behavior)
-            tr_result = await db.execute(
-                select(TailoredResume).where(TailoredResume.id == data.tailored_resume_id)
-            )
-            tr = tr_result.scalar_one_or_none()
-            if tr:
-                resolved_base_resume_id = tr.base_resume_id
-                br_result = await db.execute(
-                    select(BaseResume).where(BaseResume.id == tr.base_resume_id)
-                )
-                br = br_result.scalar_one_or_none()
-                if br:
-                    resume_context = {
-                        "summary": tr.tailored_summary or br.summary,
-                        "experience": tr.tailored_experience or br.experience,
-                        "skills": tr.tailored_skills or br.skills,
-                        "name": br.candidate_name,
-                    }
-        elif data.base_resume_id:
-            # Path 2: From a base (uploaded) resume directly
-            resolved_base_resume_id = data.base_resume_id
-            br_result = await db.execute(
-                select(BaseResume).where(BaseResume.id == data.base_resume_id)
-            )
-            br = br_result.scalar_one_or_none()
-            if br:
-                resume_context = {
-                    "summary": br.summary or "",
-                    "experience": br.experience or "",
-                    "skills": br.skills or "",
-                    "name": br.candidate_name,
-                }
-
-        # Research company with Perplexity
-        company_research = None
-        try:
-            from app.services.perplexity_client import PerplexityClient
-            perplexity = PerplexityClient()
-            company_research = await perplexity.research_company(
-                company_name=data.company_name,
-                job_title=data.job_title
-            )
-            logger.info(f"Perplexity research completed for {data.company_name}")
-        except Exception as e:
-            logger.warning(f"Perplexity research failed for {data.company_name}: {e}")
-            company_research = None
+        job_description, resume_context, resolved_base_resume_id, company_research = \
+            await _resolve_generation_context(data, db)
 
         content = await generate_cover_letter_content(
             job_title=data.job_title,
@@ -250,6 +270,78 @@ async def generate_cover_letter(
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
 
+@router.post("/generate/stream")
+@limiter.limit("10/hour")
+async def generate_cover_letter_stream(
+    request: Request,
+    data: GenerateRequest,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Same as /generate, but streams the letter as server-sent events while the model
+    writes it: `{"delta": ...}` chunks, then a final `{"done": true, "cover_letter": ...}`
+    once the letter is saved, or `{"error": ...}` if generation fails mid-stream.
+    """
+    valid_tones = ("professional", "enthusiastic", "conversational", "strategic", "technical")
+    if data.tone not in valid_tones:
+        raise HTTPException(status_code=400, detail=f"Invalid tone. Must be one of: {', '.join(valid_tones)}")
+
+    try:
+        job_description, resume_context, resolved_base_resume_id, company_research = \
+            await _resolve_generation_context(data, db)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cover letter generation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
+
+    async def event_stream():
+        parts = []
+        try:
+            async for delta in stream_cover_letter_content(
+                job_title=data.job_title,
+                company_name=data.company_name,
+                job_description=job_description,
+                tone=data.tone,
+                length=data.length,
+                focus=data.focus,
+                resume_context=resume_context,
+                company_research=company_research,
+            ):
+                parts.append(delta)
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+
+            # The request-scoped session is closed once the response starts, so the
+            # letter is saved with its own session.
+            async with AsyncSessionLocal() as session:
+                letter = CoverLetter(
+                    session_user_id=user_id,
+                    tailored_resume_id=data.tailored_resume_id,
+                    base_resume_id=resolved_base_resume_id,
+                    job_title=data.job_title,
+                    company_name=data.company_name,
+                    job_description=job_description,
+                    tone=data.tone,
+                    content="".join(parts).strip(),
+                )
+                session.add(letter)
+                await session.commit()
+                await session.refresh(letter)
+
+            yield f"data: {json.dumps({'done': True, 'cover_letter': letter.to_dict()})}\n\n"
+
+        except Exception as e:
+            logger.error(f"Cover letter streaming error: {str(e)}")
+            yield f"data: {json.dumps({'error': f'Generation failed: {str(e)}'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.put("/{letter_id}")
 async def update_cover_letter(
     letter_id: int,
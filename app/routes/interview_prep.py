@@ -13,7 +13,7 @@ from app.models.job import Job
 from app.models.company import CompanyResearch
 from app.services.openai_interview_prep import OpenAIInterviewPrep
 from app.services.openai_common_questions import OpenAICommonQuestions
-from app.services.company_research_service import CompanyResearchService
+from app.services.company_research_service import get_company_research_service
 from app.services.news_aggregator_service import NewsAggregatorService
 from app.services.interview_questions_scraper import InterviewQuestionsScraperService
 from app.services.interview_intelligence_service import InterviewIntelligenceService
@@ -1153,7 +1153,7 @@ async def get_company_research(request: CompanyResearchRequest):
     Returns strategic initiatives, recent developments, technology focus with source URLs.
     """
     try:
-        service = CompanyResearchService()
+        service = get_company_research_service()
 
         research_data = await service.research_company_strategies(
             company_name=request.company_name,
@@ -1303,7 +1303,7 @@ async def get_company_values(request: CompanyValuesRequest):
     - Work environment details
     """
     try:
-        service = CompanyResearchService()
+        service = get_company_research_service()
 
         values_data = await service.research_company_values_culture(
             company_name=request.company_name,
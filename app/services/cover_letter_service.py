@@ -1,45 +1,111 @@
 """Cover Letter Generation Service"""
 
+import asyncio
+import functools
+import hashlib
 import os
 import json
 from openai import AsyncOpenAI
-from app.services.gateway import get_gateway
-from typing import Optional
+from app.services.cache import cache_get, cache_set
+from app.services.gateway import GATEWAY_CONFIG, get_gateway
+from typing import AsyncIterator, Optional
 
+# Letters are reused for identical requests (same job, options and resume) within this window
+_COVER_LETTER_CACHE_TTL = 3600
 
-async def generate_cover_letter_content(
+# Streamed letters: the gateway only covers opening the stream, so reading it has its own
+# deadlines - the same overall budget as a non-streamed call, and a cap on silence between chunks
+_STREAM_TOTAL_TIMEOUT = GATEWAY_CONFIG["openai"].timeout_seconds
+_STREAM_IDLE_TIMEOUT = 30.0
+
+# Prompt fragments for each tone/length/focus option (unknown values fall back to the default)
+_TONE_INSTRUCTIONS = {
+    "professional": "Use a formal, polished tone. Be direct and confident.",
+    "enthusiastic": "Use an energetic, passionate tone. Show excitement for the role.",
+    "conversational": "Use a friendly, approachable tone. Be personable and warm.",
+    "strategic": "Use a strategic, results-oriented tone. Emphasize vision and impact.",
+    "technical": "Use a technically precise tone. Highlight technical depth and expertise.",
+}
+
+_LENGTH_INSTRUCTIONS = {
+    "concise": "Write 3 paragraphs (250-300 words).",
+    "standard": "Write 4 paragraphs (300-400 words).",
+    "detailed": "Write 5 paragraphs (400-500 words).",
+}
+
+_FOCUS_INSTRUCTIONS = {
+    "leadership": "Emphasize leadership experience, team management, and strategic decision-making.",
+    "technical": "Emphasize technical expertise, tools, frameworks, and hands-on experience.",
+    "program_management": "Emphasize program/project management, delivery, and cross-team coordination.",
+    "cross_functional": "Emphasize cross-functional collaboration, stakeholder management, and communication.",
+}
+
+
+# System prompt - fully static (requirements included) so every request shares the
+# same prefix for provider-side prompt caching; per-request inputs go in the user message.
+_SYSTEM_PROMPT = """You are an expert career coach who writes compelling, deeply tailored cover letters. When company research is provided, weave in references to the company's mission, values, recent initiatives, and culture to show genuine knowledge and alignment. When resume context is provided, connect the candidate's specific experience and achievements to the job requirements.
+
+REQUIREMENTS:
+- Write a complete cover letter with greeting, body paragraphs, and professional closing
+- Follow the LENGTH instruction for paragraph count and word count
+- Follow the FOCUS instruction to emphasize the right skills and experience
+- Follow the TONE instruction for voice and register
+- Reference specific job requirements from the description
+- If resume context is provided, connect the candidate's experience to the role
+- If company research is provided, reference the company's mission, values, or recent initiatives to demonstrate cultural fit and genuine interest
+- Include measurable achievements where possible
+- Do NOT include placeholder brackets like [Your Name] — write it as a complete letter
+- Address it to the hiring manager at the company named in JOB DETAILS
+- Sign off with the candidate's name if available
+
+Return ONLY the cover letter text, no JSON or markdown formatting."""
+
+
+@functools.lru_cache(maxsize=1)
+def _get_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """One AsyncOpenAI client (and connection pool) per API key, reused across requests."""
+    return AsyncOpenAI(api_key=api_key)
+
+
+def _cover_letter_cache_key(
     job_title: str,
     company_name: str,
     job_description: str,
-    tone: str = "professional",
-    length: str = "standard",
-    focus: str = "program_management",
-    resume_context: Optional[dict] = None,
-    company_research: Optional[dict] = None,
+    tone: str,
+    length: str,
+    focus: str,
+    resume_context: Optional[dict],
 ) -> str:
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-    tone_instructions = {
-        "professional": "Use a formal, polished tone. Be direct and confident.",
-        "enthusiastic": "Use an energetic, passionate tone. Show excitement for the role.",
-        "conversational": "Use a friendly, approachable tone. Be personable and warm.",
-        "strategic": "Use a strategic, results-oriented tone. Emphasize vision and impact.",
-        "technical": "Use a technically precise tone. Highlight technical depth and expertise.",
-    }
+    """
+    Cache key for a generated letter: job details + options + resume context.
 
-    length_instructions = {
-        "concise": "Write 3 paragraphs (250-300 words).",
-        "standard": "Write 4 paragraphs (300-400 words).",
-        "detailed": "Write 5 paragraphs (400-500 words).",
+    Company research is left out on purpose - it is re-fetched live for every
+    request and never byte-identical, so including it would defeat the cache.
+    """
+    payload = {
+        "job_title": job_title,
+        "company_name": company_name,
+        "job_description": job_description,
+        "tone": tone,
+        "length": length,
+        "focus": focus,
+        "resume": resume_context,
     }
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    return f"cover_letter:{digest}"
 
-    focus_instructions = {
-        "leadership": "Emphasize leadership experience, team management, and strategic decision-making.",
-        "technical": "Emphasize technical expertise, tools, frameworks, and hands-on experience.",
-        "program_management": "Emphasize program/project management, delivery, and cross-team coordination.",
-        "cross_functional": "Emphasize cross-functional collaboration, stakeholder management, and communication.",
-    }
 
+def _build_user_prompt(
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    tone: str,
+    length: str,
+    focus: str,
+    resume_context: Optional[dict],
+    company_research: Optional[dict],
+) -> str:
+    """Per-request user message: job details, resume/research context and chosen options."""
     resume_section = ""
     if resume_context:
         resume_section = f"""
@@ -57,41 +123,119 @@ COMPANY RESEARCH (use this to personalize the letter):
 {company_research['research']}
 """
 
-    prompt = f"""Generate a compelling cover letter for the following position.
+    return f"""Generate a compelling cover letter for the following position.
 
 JOB DETAILS:
 - Title: {job_title}
 - Company: {company_name}
 - Description: {job_description}
 {resume_section}{research_section}
-TONE: {tone_instructions.get(tone, tone_instructions['professional'])}
-LENGTH: {length_instructions.get(length, length_instructions['standard'])}
-FOCUS: {focus_instructions.get(focus, focus_instructions['program_management'])}
+TONE: {_TONE_INSTRUCTIONS.get(tone, _TONE_INSTRUCTIONS['professional'])}
+LENGTH: {_LENGTH_INSTRUCTIONS.get(length, _LENGTH_INSTRUCTIONS['standard'])}
+FOCUS: {_FOCUS_INSTRUCTIONS.get(focus, _FOCUS_INSTRUCTIONS['program_management'])}"""
 
-REQUIREMENTS:
-- Write a complete cover letter with greeting, body paragraphs, and professional closing
-- Follow the LENGTH instruction for paragraph count and word count
-- Follow the FOCUS instruction to emphasize the right skills and experience
-- Reference specific job requirements from the description
-- If resume context is provided, connect the candidate's experience to the role
-- If company research is provided, reference the company's mission, values, or recent initiatives to demonstrate cultural fit and genuine interest
-- Include measurable achievements where possible
-- Do NOT include placeholder brackets like [Your Name] — write it as a complete letter
-- Address it to the hiring manager at {company_name}
-- Sign off with the candidate's name if available
 
-Return ONLY the cover letter text, no JSON or markdown formatting."""
-
-    response = await get_gateway().execute(
+async def _create_completion(prompt: str, stream: bool = False):
+    """Run the cover letter completion through the gateway (streamed or not)."""
+    client = _get_client(os.getenv("OPENAI_API_KEY"))
+    return await get_gateway().execute(
         "openai",
         client.chat.completions.create,
         model="gpt-4.1-mini",
         messages=[
-            {"role": "system", "content": "You are an expert career coach who writes compelling, deeply tailored cover letters. When company research is provided, weave in references to the company's mission, values, recent initiatives, and culture to show genuine knowledge and alignment. When resume context is provided, connect the candidate's specific experience and achievements to the job requirements."},
+            {"role": "system", "content": _SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         temperature=0.7,
         max_tokens=2500,
+        stream=stream,
+    )
+
+
+async def generate_cover_letter_content(
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    tone: str = "professional",
+    length: str = "standard",
+    focus: str = "program_management",
+    resume_context: Optional[dict] = None,
+    company_research: Optional[dict] = None,
+) -> str:
+    cache_key = _cover_letter_cache_key(
+        job_title, company_name, job_description, tone, length, focus, resume_context
+    )
+    cached_letter = await cache_get(cache_key)
+    if cached_letter:
+        return cached_letter
+
+    prompt = _build_user_prompt(
+        job_title, company_name, job_description, tone, length, focus, resume_context, company_research
     )
+    response = await _create_completion(prompt)
+
+    content = response.choices[0].message.content.strip()
+    await cache_set(cache_key, content, ttl=_COVER_LETTER_CACHE_TTL)
+    return content
+
+
+async def stream_cover_letter_content(
+    job_title: str,
+    company_name: str,
+    job_description: str,
+    tone: str = "professional",
+    length: str = "standard",
+    focus: str = "program_management",
+    resume_context: Optional[dict] = None,
+    company_research: Optional[dict] = None,
+) -> AsyncIterator[str]:
+    """
+    Same letter as generate_cover_letter_content, yielded as text deltas as the model
+    produces them. A cached letter is yielded whole; a completed one is cached.
+
+    Only opening the stream goes through the gateway (circuit breaker, concurrency limit,
+    retry): its slot is released once the response starts, since a retry after deltas
+    were sent would duplicate text. Reading the stream is bounded here instead and
+    raises asyncio.TimeoutError past _STREAM_TOTAL_TIMEOUT or _STREAM_IDLE_TIMEOUT.
+    """
+    cache_key = _cover_letter_cache_key(
+        job_title, company_name, job_description, tone, length, focus, resume_context
+    )
+    cached_letter = await cache_get(cache_key)
+    if cached_letter:
+        yield cached_letter
+        return
+
+    prompt = _build_user_prompt(
+        job_title, company_name, job_description, tone, length, focus, resume_context, company_research
+    )
+    stream = await _create_completion(prompt, stream=True)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _STREAM_TOTAL_TIMEOUT
+    chunks = stream.__aiter__()
+    parts = []
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError("Cover letter stream exceeded its time budget")
+            try:
+                chunk = await asyncio.wait_for(
+                    chunks.__anext__(), timeout=min(_STREAM_IDLE_TIMEOUT, remaining)
+                )
+            except StopAsyncIteration:
+                break
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+    finally:
+        # Drop the HTTP response on timeout, error or client disconnect
+        await stream.close()
 
-    return response.choices[0].message.content.strip()
+    content = "".join(parts).strip()
+    if content:
+        await cache_set(cache_key, content, ttl=_COVER_LETTER_CACHE_TTL)
@@ -2,14 +2,181 @@
 Firecrawl client for extracting job posting details from URLs
 """
 import os
+import re
+import json
+import html
 import asyncio
+import copy
+import hashlib
 from typing import Dict, Any, Optional, List
-from functools import partial
+from functools import lru_cache, partial
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
 from app.config import get_settings
+from app.services.cache import cache_get, cache_set
 from app.services.gateway import get_gateway
 
 settings = get_settings()
 
+# Extracted job details are reused for a day: repeat submissions of the same posting
+# skip the scrape, the JSON extraction and any OpenAI/Playwright/Vision fallback.
+_JOB_EXTRACT_CACHE_TTL = 24 * 3600
+
+# raw_text keeps the head of the scraped page only: nothing downstream reads the full
+# markdown (often 50-200KB), and the whole result is cached per URL.
+_RAW_TEXT_MAX_CHARS = 8192
+
+# How long the SDK polls a batch scrape job. Kept under the firecrawl_batch gateway timeout
+# so the SDK ends its poll loop itself instead of leaving the worker thread polling.
+_BATCH_WAIT_SECONDS = 40
+
+# Extractions currently running, by cache key. Concurrent requests for the same posting
+# wait on the one already in progress instead of starting another scrape + extraction.
+_job_extractions_in_flight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+# Single-page scrapes call Firecrawl's REST API directly on a shared async pool instead of
+# running the sync SDK in a worker thread (whose HTTP client opens a new connection per call).
+_FIRECRAWL_API_URL = "https://api.firecrawl.dev"
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=5, keepalive_expiry=60)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+class FirecrawlAPIError(Exception):
+    """Non-success response from the Firecrawl API (status_code lets the gateway retry 429/5xx)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared Firecrawl HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(base_url=_FIRECRAWL_API_URL, limits=_HTTP_LIMITS, timeout=60.0)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _scrape_document(
+    api_key: str,
+    url: str,
+    formats: List[Any],
+    only_main_content: bool = True,
+    timeout: Optional[int] = None,
+    max_age: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    POST /v2/scrape and return the response's document dict ("markdown", "html", "json", ...)
+
+    timeout and max_age are in milliseconds, as in the SDK.
+    """
+    payload: Dict[str, Any] = {"url": url.strip(), "formats": formats, "onlyMainContent": only_main_content}
+    if timeout is not None:
+        payload["timeout"] = timeout
+    if max_age is not None:
+        payload["maxAge"] = max_age
+
+    response = await _get_http_client().post(
+        "/v2/scrape",
+        json=payload,
+        headers={"Authorization": f"Bearer {api_key}"},
+        # Give Firecrawl its own timeout plus a little headroom to respond
+        timeout=timeout / 1000 + 5 if timeout else httpx.USE_CLIENT_DEFAULT,
+    )
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    if response.is_error or not body.get("success"):
+        error = body.get("error") or response.text[:500] or "Unknown error occurred"
+        raise FirecrawlAPIError(
+            f"Firecrawl scrape failed ({response.status_code}): {error}",
+            status_code=response.status_code,
+        )
+    return body.get("data") or {}
+
+
+@lru_cache(maxsize=1)
+def _get_firecrawl_app(api_key: str):
+    """One FirecrawlApp per API key, shared by every scrape in this process"""
+    from firecrawl import FirecrawlApp
+    return FirecrawlApp(api_key=api_key)
+
+
+@lru_cache(maxsize=1)
+def _get_openai_client(api_key: Optional[str]):
+    """Shared AsyncOpenAI client for the company/title fallback, so its connection pool persists"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key)
+
+
+# schema.org JSON-LD blocks; job boards and ATS pages embed a JobPosting with company and title
+_JSON_LD_RE = re.compile(
+    r'<script[^>]*type\s*=\s*["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def _job_posting_from_json_ld(raw_html: str) -> Dict[str, str]:
+    """Company and title from the page's JobPosting JSON-LD, if any ({} when not found)"""
+    for match in _JSON_LD_RE.finditer(raw_html):
+        try:
+            data = json.loads(match.group(1), strict=False)
+        except ValueError:
+            continue
+
+        # A block holds one object, a list of them, or an @graph of them
+        nodes = data if isinstance(data, list) else [data]
+        nodes = [graph for node in nodes if isinstance(node, dict) for graph in node.get("@graph", [node])]
+        for node in nodes:
+            if not isinstance(node, dict):
+                continue
+            node_type = node.get("@type")
+            if node_type != "JobPosting" and not (isinstance(node_type, list) and "JobPosting" in node_type):
+                continue
+
+            organization = node.get("hiringOrganization")
+            if isinstance(organization, list):
+                organization = organization[0] if organization else None
+            if isinstance(organization, dict):
+                organization = organization.get("name")
+
+            posting = {}
+            if isinstance(organization, str) and organization.strip():
+                posting["company"] = html.unescape(organization.strip())
+            if isinstance(node.get("title"), str) and node["title"].strip():
+                posting["title"] = html.unescape(node["title"].strip())
+            if posting:
+                return posting
+    return {}
+
+
+def _job_cache_key(job_url: str) -> str:
+    """
+    Cache key for a job URL, ignoring utm_* tracking params and trailing slashes.
+    The fragment is kept: hash-routed ATS pages (careers.example.com/#/job/123) use it
+    to tell postings apart.
+    """
+    parts = urlsplit(job_url.strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    ])
+    normalized = urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, parts.fragment
+    ))
+    return f"firecrawl_job:{hashlib.sha256(normalized.encode()).hexdigest()}"
+
 
 class FirecrawlClient:
     """Client for extracting job details from job posting URLs using Firecrawl"""
@@ -19,12 +186,13 @@ class FirecrawlClient:
         # Firecrawl is available via MCP, no initialization needed
         pass
 
-    async def extract_job_details(self, job_url: str) -> Dict[str, Any]:
+    async def extract_job_details(self, job_url: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Extract structured job details from a job posting URL
 
         Args:
             job_url: URL to job posting (LinkedIn, Indeed, company site, etc.)
+            force_refresh: Skip the cached result and extract the posting again
 
         Returns:
             Dictionary with extracted job details:
@@ -41,6 +209,41 @@ class FirecrawlClient:
                 "raw_text": str
             }
         """
+        cache_key = _job_cache_key(job_url)
+        if not force_refresh:
+            cached = await cache_get(cache_key)
+            if cached is not None:
+                print(f"Job details cache hit for URL: {job_url}")
+                return cached
+
+        task = _job_extractions_in_flight.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._extract_and_cache_job_details(job_url, cache_key))
+            _job_extractions_in_flight[cache_key] = task
+            task.add_done_callback(lambda done: self._finish_job_extraction(cache_key, done))
+        else:
+            print(f"Joining in-flight extraction for URL: {job_url}")
+
+        # Shielded so one caller disconnecting doesn't cancel the extraction for the others;
+        # each caller gets its own copy of the shared result
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _extract_and_cache_job_details(self, job_url: str, cache_key: str) -> Dict[str, Any]:
+        """Run one uncached extraction and store the result for later requests"""
+        result = await self._extract_job_details(job_url)
+        await cache_set(cache_key, result, ttl=_JOB_EXTRACT_CACHE_TTL)
+        return result
+
+    @staticmethod
+    def _finish_job_extraction(cache_key: str, task: asyncio.Task) -> None:
+        """Done callback: let the next request for this URL start (or hit the cache)"""
+        _job_extractions_in_flight.pop(cache_key, None)
+        if not task.cancelled():
+            # Mark the error retrieved even if every waiter has gone away
+            task.exception()
+
+    async def _extract_job_details(self, job_url: str) -> Dict[str, Any]:
+        """Uncached extract_job_details: Firecrawl, then Playwright, then Vision fallback"""
         print(f"Extracting job details from URL: {job_url}")
 
         # TEST MODE: Return mock data
@@ -72,8 +275,6 @@ class FirecrawlClient:
         try:
             # Use Firecrawl to scrape the job page content first
             # We'll scrape to get clean markdown, then extract structured data from it
-            from firecrawl import FirecrawlApp
-
             firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY', '')
 
             if not firecrawl_api_key:
@@ -82,31 +283,20 @@ class FirecrawlClient:
                     "or set TEST_MODE=true to use mock data."
                 )
 
-            app = FirecrawlApp(api_key=firecrawl_api_key)
-
-            print("Scraping job page with Firecrawl...")
+            print("Scraping and extracting job page with Firecrawl...")
 
-            # Run synchronous Firecrawl operations in thread pool
-            # Scrape the page to get clean content (v2 API uses scrape() with keyword args)
-            scrape_result = await get_gateway().execute("firecrawl", asyncio.to_thread,
-                app.scrape,
+            # Scrape the page to get clean content. Both calls start now: neither depends on the other
+            scrape_task = asyncio.create_task(get_gateway().execute("firecrawl", _scrape_document,
+                firecrawl_api_key,
                 job_url,
-                formats=['markdown'],
+                # rawHtml keeps the <head> JSON-LD that cleaned html/markdown drop
+                formats=['markdown', 'rawHtml'],
                 only_main_content=True  # Focus on main content, skip headers/footers
-            )
+            ))
 
-            # v2 SDK returns a Document object (Pydantic model), access attributes directly
-            if not scrape_result or not hasattr(scrape_result, 'markdown') or not scrape_result.markdown:
-                raise ValueError("Failed to scrape job page - no content returned")
-
-            markdown_content = scrape_result.markdown
-            print(f"Job page scraped: {len(markdown_content)} characters")
-
-            # Now use Firecrawl's extract feature to get structured data (v2 API uses scrape with JSON format)
-            print("Extracting structured job data...")
-
-            extract_result = await get_gateway().execute("firecrawl", asyncio.to_thread,
-                app.scrape,
+            # Use Firecrawl's extract feature to get structured data (v2 API uses scrape with JSON format)
+            extract_task = asyncio.create_task(get_gateway().execute("firecrawl", _scrape_document,
+                firecrawl_api_key,
                 job_url,
                 formats=[{
                     'type': 'json',
@@ -157,21 +347,32 @@ class FirecrawlClient:
                 }],
                 only_main_content=False,
                 timeout=120000
-            )
+            ))
+
+            try:
+                scrape_result = await scrape_task
+                markdown_content = scrape_result.get('markdown')
+                if not markdown_content:
+                    raise ValueError("Failed to scrape job page - no content returned")
+            except BaseException:
+                # Without the markdown this path is done: free the extraction's gateway slot
+                # and go to the Playwright fallback now rather than after the extraction ends
+                extract_task.cancel()
+                raise
 
-            # Check if extraction succeeded (v2 SDK returns Document object with json attribute)
+            print(f"Job page scraped: {len(markdown_content)} characters")
+
+            # A failed extraction still leaves the markdown for the OpenAI fallback below
+            try:
+                extract_result = await extract_task
+            except Exception as extract_error:
+                print(f"Firecrawl extraction failed: {extract_error}")
+                extract_result = None
+
+            # Check if extraction succeeded (the document's "json" field holds the schema result)
             extracted_data = None
-            if extract_result and hasattr(extract_result, 'json') and extract_result.json:
-                # The json attribute might be a Pydantic model or dict - convert to dict if needed
-                json_data = extract_result.json
-                if hasattr(json_data, 'model_dump'):
-                    extracted_data = json_data.model_dump()
-                elif hasattr(json_data, 'dict'):
-                    extracted_data = json_data.dict()
-                elif isinstance(json_data, dict):
-                    extracted_data = json_data
-                else:
-                    extracted_data = dict(json_data) if json_data else None
+            if extract_result and isinstance(extract_result.get('json'), dict) and extract_result['json']:
+                extracted_data = extract_result['json']
                 print(f"Firecrawl extraction succeeded")
             else:
                 print("Firecrawl extraction returned no data, will use OpenAI fallback")
@@ -180,13 +381,22 @@ class FirecrawlClient:
             company = extracted_data.get('company', '') if extracted_data else ''
             title = extracted_data.get('title', '') if extracted_data else ''
 
+            # Fill gaps from the page's JobPosting JSON-LD before paying for an OpenAI call
+            if not company or company == 'Unknown Company' or not title or title == 'Unknown Position':
+                posting = _job_posting_from_json_ld(scrape_result.get('rawHtml') or '')
+                if not company or company == 'Unknown Company':
+                    company = posting.get('company', company)
+                if not title or title == 'Unknown Position':
+                    title = posting.get('title', title)
+                if posting:
+                    print(f"✓ JSON-LD JobPosting found: {company} - {title}")
+
             # Check if we got actual data or just defaults
             if not company or company == 'Unknown Company' or not title or title == 'Unknown Position':
                 print("Company or title missing, using OpenAI to extract from markdown content...")
 
                 # Use OpenAI to extract company and title from the scraped markdown
-                from openai import AsyncOpenAI
-                openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+                openai_client = _get_openai_client(os.getenv('OPENAI_API_KEY'))
 
                 extraction_prompt = f"""Extract the company name and job title from this job posting.
 
@@ -213,7 +423,6 @@ Do not include any other text, only the JSON."""
                         temperature=0.1
                     )
 
-                    import json
                     ai_extracted = json.loads(ai_response.choices[0].message.content)
                     company = ai_extracted.get('company', company)
                     title = ai_extracted.get('title', title)
@@ -247,18 +456,12 @@ Do not include any other text, only the JSON."""
                 "employment_type": extracted_data.get('employment_type', '') if extracted_data else '',
                 "experience_level": extracted_data.get('experience_level', '') if extracted_data else '',
                 "skills_required": extracted_data.get('skills_required', []) if extracted_data else [],
-                "raw_text": markdown_content
+                "raw_text": markdown_content[:_RAW_TEXT_MAX_CHARS]
             }
 
             print(f"✓ Final extracted data: {result['company']} - {result['title']}")
             return await self.validate_extraction_result(result, job_url)
 
-        except ImportError:
-            print("WARNING: Firecrawl package not installed. Install with: pip install firecrawl-py")
-            raise ValueError(
-                "Firecrawl not available. Please install: pip install firecrawl-py, "
-                "or set TEST_MODE=true to use mock data."
-            )
         except Exception as e:
             print(f"Firecrawl extraction error: {str(e)}")
 
@@ -298,13 +501,14 @@ Do not include any other text, only the JSON."""
                         f"Please provide company name and job title manually."
                     )
 
-    async def scrape_page(self, url: str, formats: List[str] = None) -> str:
+    async def scrape_page(self, url: str, formats: List[str] = None, max_age: Optional[int] = None) -> str:
         """
         Scrape a page using Firecrawl and return content in requested format
 
         Args:
             url: URL to scrape
             formats: List of formats to return (e.g., ["markdown", "html"])
+            max_age: Accept Firecrawl's cached copy if younger than this many ms
 
         Returns:
             Scraped content as string (markdown by default)
@@ -313,46 +517,89 @@ Do not include any other text, only the JSON."""
             formats = ["markdown"]
 
         try:
-            from firecrawl import FirecrawlApp
-            import os
-            import asyncio
-
             firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY', '')
 
             if not firecrawl_api_key:
                 raise ValueError("FIRECRAWL_API_KEY not found")
 
-            app = FirecrawlApp(api_key=firecrawl_api_key)
-
             print(f"Scraping page: {url}")
 
             # Use Firecrawl v2 scrape API
-            scrape_result = await get_gateway().execute("firecrawl", asyncio.to_thread,
-                app.scrape,
+            scrape_result = await get_gateway().execute("firecrawl", _scrape_document,
+                firecrawl_api_key,
                 url,
                 formats=formats,
                 only_main_content=True,
-                timeout=30000
+                timeout=30000,
+                max_age=max_age
             )
 
-            # Extract content based on requested format
-            if "markdown" in formats and hasattr(scrape_result, 'markdown'):
-                return scrape_result.markdown or ""
-            elif "html" in formats and hasattr(scrape_result, 'html'):
-                return scrape_result.html or ""
-            else:
-                # Try to get any available content
-                if hasattr(scrape_result, 'markdown'):
-                    return scrape_result.markdown or ""
-                elif hasattr(scrape_result, 'html'):
-                    return scrape_result.html or ""
-                else:
-                    return ""
+            # Extract content based on requested format, else whatever is available
+            if "html" in formats and "markdown" not in formats:
+                return scrape_result.get('html') or ""
+            return scrape_result.get('markdown') or ""
 
         except Exception as e:
             print(f"Failed to scrape {url}: {e}")
             return ""
 
+    async def batch_scrape(self, urls: List[str], formats: List[str] = None, max_age: Optional[int] = None) -> Dict[str, str]:
+        """
+        Scrape several pages with one Firecrawl batch job
+
+        Args:
+            urls: URLs to scrape
+            formats: List of formats to return (e.g., ["markdown"])
+            max_age: Accept Firecrawl's cached copy if younger than this many ms
+
+        Returns:
+            Mapping of requested URL to scraped content (markdown by default).
+            URLs Firecrawl returned nothing for are left out.
+
+        Raises:
+            Exception: If the batch job fails, so callers can fall back to scrape_page
+        """
+        if formats is None:
+            formats = ["markdown"]
+
+        firecrawl_api_key = os.getenv('FIRECRAWL_API_KEY', '')
+
+        if not firecrawl_api_key:
+            raise ValueError("FIRECRAWL_API_KEY not found")
+
+        app = _get_firecrawl_app(firecrawl_api_key)
+
+        print(f"Batch scraping {len(urls)} pages")
+
+        # One job for all URLs; the SDK polls until the batch completes
+        job = await get_gateway().execute("firecrawl_batch", asyncio.to_thread,
+            app.batch_scrape,
+            urls,
+            formats=formats,
+            only_main_content=True,
+            timeout=30000,
+            max_age=max_age,
+            poll_interval=1,
+            wait_timeout=_BATCH_WAIT_SECONDS
+        )
+
+        # Documents come back in completion order, so key them by the URL they were requested with
+        requested = {u.rstrip('/'): u for u in urls}
+        results = {}
+        for doc in (getattr(job, 'data', None) or []):
+            metadata = getattr(doc, 'metadata', None)
+            url = getattr(metadata, 'source_url', None) or getattr(metadata, 'url', None)
+            if not url:
+                continue
+            if "markdown" in formats:
+                content = getattr(doc, 'markdown', None)
+            else:
+                content = getattr(doc, 'html', None)
+            if content:
+                results[requested.get(url.rstrip('/'), url)] = content
+
+        return results
+
     # CRITICAL VALIDATION: Apply to ALL extraction paths (Firecrawl, Playwright, Vision)
     # This validation must happen AFTER all fallback methods complete
     async def validate_extraction_result(self, result: Dict[str, str], job_url: str) -> Dict[str, str]:
@@ -3,7 +3,7 @@ External Service Gateway — circuit breaker, concurrency limiter, retry, timeou
 
 Wraps all calls to OpenAI, Perplexity, Firecrawl, Playwright with:
   1. Circuit breaker (fail-fast when provider is down)
-  2. Concurrency semaphore (prevent overload)
+  2. Adaptive concurrency limit (prevent overload; shrinks when the provider struggles)
   3. Timeout enforcement
   4. Retry with exponential backoff + jitter
 
@@ -14,6 +14,7 @@ Usage:
 import asyncio
 import time
 import random
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Coroutine, Dict, Optional
@@ -58,6 +59,16 @@ GATEWAY_CONFIG: Dict[str, ServiceConfig] = {
         circuit_failure_threshold=3,
         circuit_recovery_seconds=60.0,
     ),
+    # Batch scrapes submit a job and poll it: a retry would submit a duplicate job while
+    # the first still runs, so failures go straight to the caller's per-URL fallback.
+    # The SDK's own wait (_BATCH_WAIT_SECONDS in firecrawl_client) stays under this timeout.
+    "firecrawl_batch": ServiceConfig(
+        max_concurrent=2,
+        timeout_seconds=45.0,
+        max_retries=0,
+        circuit_failure_threshold=3,
+        circuit_recovery_seconds=60.0,
+    ),
     "playwright": ServiceConfig(
         max_concurrent=2,
         timeout_seconds=60.0,
@@ -137,6 +148,74 @@ class CircuitBreaker:
             )
 
 
+# ---------------------------------------------------------------------------
+# Adaptive concurrency limiter
+# ---------------------------------------------------------------------------
+
+class AdaptiveLimiter:
+    """
+    Per-service AIMD concurrency limit (single event loop, like CircuitBreaker).
+
+    max_concurrent is the ceiling, not a fixed value: each call that ends in a timeout
+    or overload status halves the limit (never below 1), each other completed call
+    raises it by one back toward the ceiling. A provider that starts stalling gets
+    fewer simultaneous calls instead of tying up every slot until it times out.
+    """
+
+    def __init__(self, service: str, max_concurrent: int):
+        self.service = service
+        self.max_concurrent = max_concurrent
+        self.limit = float(max_concurrent)
+        self.in_flight = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+
+    def _capacity(self) -> int:
+        return max(1, int(self.limit)) - self.in_flight
+
+    async def acquire(self) -> None:
+        # Queued callers go first, so a newcomer never overtakes someone already waiting
+        if not self._waiters and self._capacity() > 0:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # _wake hands the slot over (in_flight already counts it) before resolving
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot but cancelled before using it - pass it to the next waiter
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, completed: bool, overloaded: bool = False) -> None:
+        """
+        Free a slot. Only completed calls move the limit: overloaded ones halve it, the
+        rest raise it by one. Cancelled calls (completed=False) say nothing about the provider.
+        """
+        self.in_flight -= 1
+        if completed:
+            if overloaded:
+                self.limit = max(1.0, self.limit * 0.5)
+            else:
+                self.limit = min(float(self.max_concurrent), self.limit + 1)
+            observe(f"{self.service}.concurrency", self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Give free slots to waiters in arrival order."""
+        while self._waiters and self._capacity() > 0:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue  # Cancelled while queued
+            self.in_flight += 1
+            waiter.set_result(None)
+
+
 # ---------------------------------------------------------------------------
 # Retryable error detection
 # ---------------------------------------------------------------------------
@@ -159,6 +238,17 @@ def _is_retryable(exc: Exception) -> bool:
     return False
 
 
+def _is_overload(exc: Exception) -> bool:
+    """Return True if the error means the provider is saturated (timeout or 429/5xx)."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    try:
+        return bool(status) and int(status) in _RETRYABLE_STATUS_CODES
+    except (TypeError, ValueError):
+        return False
+
+
 # ---------------------------------------------------------------------------
 # Gateway (singleton)
 # ---------------------------------------------------------------------------
@@ -176,11 +266,11 @@ class ServiceGateway:
 
     def __init__(self) -> None:
         self._circuits: Dict[str, CircuitBreaker] = {}
-        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
 
         for service, cfg in GATEWAY_CONFIG.items():
             self._circuits[service] = CircuitBreaker(service, cfg)
-            self._semaphores[service] = asyncio.Semaphore(cfg.max_concurrent)
+            self._limiters[service] = AdaptiveLimiter(service, cfg.max_concurrent)
 
     async def execute(
         self,
@@ -192,7 +282,7 @@ class ServiceGateway:
         """
         Execute an async callable through the gateway.
 
-        Applies: circuit breaker → semaphore → timeout → retry.
+        Applies: circuit breaker → adaptive concurrency limit → timeout → retry.
         """
         cfg = GATEWAY_CONFIG.get(service)
         if not cfg:
@@ -200,7 +290,7 @@ class ServiceGateway:
             return await fn(*args, **kwargs)
 
         cb = self._circuits[service]
-        sem = self._semaphores[service]
+        limiter = self._limiters[service]
 
         if not cb.allow_request():
             raise CircuitOpenError(service)
@@ -209,11 +299,21 @@ class ServiceGateway:
         start = time.monotonic()
         for attempt in range(1 + cfg.max_retries):
             try:
-                async with sem:
+                await limiter.acquire()
+                # Stays False if the call is cancelled, so the limit is left alone
+                completed = overloaded = False
+                try:
                     result = await asyncio.wait_for(
                         fn(*args, **kwargs),
                         timeout=cfg.timeout_seconds,
                     )
+                    completed = True
+                except Exception as exc:
+                    completed = True
+                    overloaded = _is_overload(exc)
+                    raise
+                finally:
+                    limiter.release(completed, overloaded)
                 duration_ms = (time.monotonic() - start) * 1000
                 cb.record_success()
                 inc(f"{service}.success")
@@ -260,6 +360,10 @@ class ServiceGateway:
         """Return current circuit breaker states (for health check)."""
         return {svc: cb.state.value for svc, cb in self._circuits.items()}
 
+    def get_concurrency_limits(self) -> Dict[str, int]:
+        """Return each service's current adaptive concurrency limit."""
+        return {svc: max(1, int(lim.limit)) for svc, lim in self._limiters.items()}
+
 
 # Singleton
 _gateway: Optional[ServiceGateway] = None
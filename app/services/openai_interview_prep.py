@@ -1,8 +1,9 @@
 from openai import AsyncOpenAI
 from app.config import get_settings
 from app.services.gateway import get_gateway
-from app.services.company_research_service import CompanyResearchService
+from app.services.company_research_service import get_company_research_service
 from app.services.news_aggregator_service import NewsAggregatorService
+import asyncio
 import json
 import os
 
@@ -21,7 +22,7 @@ class OpenAIInterviewPrep:
 
         try:
             self.client = AsyncOpenAI(api_key=openai_api_key)
-            self.company_research_service = CompanyResearchService()
+            self.company_research_service = get_company_research_service()
             self.news_aggregator_service = NewsAggregatorService()
         except Exception as e:
             raise ValueError(
@@ -49,49 +50,42 @@ class OpenAIInterviewPrep:
             Complete interview prep JSON matching the schema
         """
 
-        # STEP 1: Fetch REAL company values using Perplexity
+        # STEPS 1-2: Fetch REAL company values, news and strategies using Perplexity.
+        # The three lookups are independent, so they run concurrently.
         perplexity_values = None
-        if company_name:
-            try:
-                print(f"🔍 Fetching real company values from Perplexity for: {company_name}")
-                perplexity_values = await self.company_research_service.research_company_values_culture(
-                    company_name=company_name,
-                    industry=company_research.get('industry'),
-                    job_title=job_title
-                )
-                print(f"✓ Perplexity returned {len(perplexity_values.get('stated_values', []))} real values")
-            except Exception as e:
-                print(f"⚠️ Perplexity values research failed: {e}, will use GPT inference")
-                perplexity_values = None
-
-        # STEP 2: Fetch REAL company news and strategies using Perplexity
         perplexity_news = None
         perplexity_strategies = None
         if company_name:
-            try:
-                print(f"🔍 Fetching real company news from Perplexity for: {company_name}")
-                perplexity_news = await self.news_aggregator_service.aggregate_company_news(
+            industry = company_research.get('industry')
+            print(f"🔍 Fetching real company values, news and strategies from Perplexity for: {company_name}")
+            company_result, news_result = await asyncio.gather(
+                self.company_research_service.research_company_all(
+                    company_name=company_name,
+                    industry=industry,
+                    job_title=job_title
+                ),
+                self.news_aggregator_service.aggregate_company_news(
                     company_name=company_name,
-                    industry=company_research.get('industry'),
+                    industry=industry,
                     job_title=job_title,
                     days_back=90
-                )
-                print(f"✓ Perplexity returned {len(perplexity_news.get('news_articles', []))} real news articles")
-            except Exception as e:
-                print(f"⚠️ Perplexity news fetch failed: {e}, will use GPT inference")
-                perplexity_news = None
+                ),
+                return_exceptions=True
+            )
 
-            try:
-                print(f"🔍 Fetching real company strategies from Perplexity for: {company_name}")
-                perplexity_strategies = await self.company_research_service.research_company_strategies(
-                    company_name=company_name,
-                    industry=company_research.get('industry'),
-                    job_title=job_title
-                )
+            if isinstance(company_result, Exception):
+                print(f"⚠️ Perplexity company research failed: {company_result}, will use GPT inference")
+            else:
+                perplexity_values = company_result["values_culture"]
+                perplexity_strategies = company_result["strategies"]
+                print(f"✓ Perplexity returned {len(perplexity_values.get('stated_values', []))} real values")
                 print(f"✓ Perplexity returned {len(perplexity_strategies.get('strategic_initiatives', []))} strategic initiatives")
-            except Exception as e:
-                print(f"⚠️ Perplexity strategies fetch failed: {e}, will use GPT inference")
-                perplexity_strategies = None
+
+            if isinstance(news_result, Exception):
+                print(f"⚠️ Perplexity news fetch failed: {news_result}, will use GPT inference")
+            else:
+                perplexity_news = news_result
+                print(f"✓ Perplexity returned {len(perplexity_news.get('news_articles', []))} real news articles")
 
         # Build real values section if Perplexity data available
         real_values_section = ""
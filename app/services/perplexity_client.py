@@ -1,9 +1,47 @@
-from openai import AsyncOpenAI
+import functools
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from app.config import get_settings
 from app.services.gateway import get_gateway
 
 settings = get_settings()
 
+# Connection pool shared by every PerplexityClient (services build one per request),
+# so research calls reuse warm keep-alive connections instead of a new TLS handshake.
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=5, keepalive_expiry=60)
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared Perplexity HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = DefaultAsyncHttpxClient(limits=_HTTP_LIMITS)
+    return _http_client
+
+
+@functools.lru_cache(maxsize=1)
+def _get_perplexity_client(api_key: str) -> AsyncOpenAI:
+    """One Perplexity (OpenAI-compatible) client per API key, shared by every instance."""
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url="https://api.perplexity.ai",
+        http_client=_get_http_client()
+    )
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    # The cached client wraps the pool being closed - rebuild it on next use
+    _get_perplexity_client.cache_clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class PerplexityClient:
     """Client for Perplexity AI company research (async)"""
 
@@ -16,10 +54,7 @@ class PerplexityClient:
             )
 
         try:
-            self.client = AsyncOpenAI(
-                api_key=settings.perplexity_api_key,
-                base_url="https://api.perplexity.ai"
-            )
+            self.client = _get_perplexity_client(settings.perplexity_api_key)
         except Exception as e:
             raise ValueError(
                 f"Failed to initialize Perplexity client: {str(e)}. "
@@ -0,0 +1,319 @@
+"""
+Career Plan Coercion
+Deterministic fixes for common LLM type mismatches in career plan JSON,
+applied before Pydantic validation so they don't cost a repair call.
+
+Kept free of service/config imports so it can be compiled (Cython pure-Python
+mode / mypyc) without changes if the coercion pass ever shows up in profiles.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Optional, Tuple
+import re
+import sys
+
+# Shared immutable default for missing list fields in coerce_plan
+_EMPTY = ()
+
+# Certification fields drawn from a small vocabulary (foundation/intermediate/advanced, CompTIA, AWS...)
+_INTERNED_CERT_FIELDS = ("tier", "level", "certifying_body")
+
+# (field, fallback) tables for string -> int coercion in coerce_plan
+_CERT_INT_RULES = (("journey_order", None), ("est_study_weeks", 8))
+_EDU_INT_RULES = (("comparison_rank", None),)
+_MATERIAL_INT_RULES = (("recommended_order", 1),)
+_SKILLS_ANALYSIS_LIST_KEYS = ("can_reframe", "already_have", "need_to_build")
+
+# Fallbacks for empty optional fields (copied on assignment - plans are mutated downstream)
+_DEFAULT_CERT_CITATIONS = ("Industry research and certification body data",)
+_DEFAULT_CERT_LINKS = ("https://www.example.com/certification",)
+_DEFAULT_EVENT_CITATIONS = ("Industry event data",)
+_DEFAULT_RESEARCH_SOURCES = ("Industry research and market data",)
+_DEFAULT_STUDY_MATERIAL = MappingProxyType({
+    "type": "official-course",
+    "url": "https://www.example.com/study-guide",
+    "cost": "Varies",
+    "duration": "Self-paced",
+    "recommended_order": 1,
+})
+
+# Event booleans the LLM sometimes emits as strings, and the strings read as True
+_EVENT_BOOL_FIELDS = ("beginner_friendly", "recurring", "virtual_option_available")
+_TRUTHY = frozenset(("true", "yes", "1", "t", "y"))
+
+# Pydantic error types repair_from_errors can fix, and the first number in free text
+_INT_ERROR_TYPES = frozenset(("int_parsing", "int_type", "int_from_float"))
+_BOOL_ERROR_TYPES = frozenset(("bool_parsing", "bool_type"))
+_FIRST_NUM_RE = re.compile(r"\d+")
+_NO_FIX = object()
+
+# "3", "Week 3", "month 3" -> 3 for timeline entries
+_WEEK_NUM_RE = re.compile(r"\s*(?:week\s+)?(\d+)\s*", re.IGNORECASE)
+_MONTH_NUM_RE = re.compile(r"\s*(?:month\s+)?(\d+)\s*", re.IGNORECASE)
+
+
+def _to_int(val: Any, default: Any = None) -> Any:
+    """int(val), or default if it can't be parsed. Plain digit strings skip the try/except."""
+    if type(val) is int:
+        return val
+    if type(val) is str and val.isdecimal():
+        return int(val)
+    try:
+        return int(val)
+    except (ValueError, TypeError):
+        return default
+
+
+def _coerce_int_fields(obj: Dict[str, Any], rules: Tuple[Tuple[str, Optional[int]], ...]) -> None:
+    """Convert string values of the given fields to int, using the fallback on bad input."""
+    for field, fallback in rules:
+        val = obj.get(field)
+        if type(val) is str:
+            obj[field] = _to_int(val, fallback)
+
+
+def coerce_plan(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Deterministically fix common GPT type mismatches before Pydantic validation.
+    These are predictable errors that can be fixed without a second LLM call.
+    Mutates and returns plan_data.
+    """
+    # Degenerate responses (empty or non-object JSON) have nothing to coerce
+    if not plan_data or type(plan_data) is not dict:
+        return plan_data
+
+    # Bound methods hoisted out of the rule loops
+    plan_get = plan_data.get
+    intern = sys.intern
+
+    try:
+        # Certification type rules (1-3, 6, 10, 19) share one pass over the list
+        for cert in (plan_get("certification_path") or _EMPTY):
+            if type(cert) is not dict:
+                continue
+            cert_get = cert.get
+
+            # 1. study_plan_weeks: all dict values must be strings (List[Dict[str, str]])
+            # Rewrite entries in place - the decoded list and dicts are reused
+            weeks = cert_get("study_plan_weeks")
+            if type(weeks) is list:
+                for week_entry in weeks:
+                    if type(week_entry) is dict:
+                        # Replacing values (not keys) is safe while iterating
+                        for k, v in week_entry.items():
+                            if type(v) is not str:
+                                week_entry[k] = str(v)
+
+            # 2. beginner_entry_point: must be bool, not string "true"/"false"
+            val = cert_get("beginner_entry_point")
+            if type(val) is str:
+                cert["beginner_entry_point"] = val.lower() == "true"
+
+            # 3. journey_order: must be int (ge=1, le=20)
+            # 10. est_study_weeks: must be int (ge=1, le=104), default 8
+            _coerce_int_fields(cert, _CERT_INT_RULES)
+
+            # 6. recommended_order in study_materials: must be int (ge=1, le=20)
+            for material in cert_get("study_materials") or _EMPTY:
+                if type(material) is dict:
+                    _coerce_int_fields(material, _MATERIAL_INT_RULES)
+
+            # 19. Intern low-cardinality cert strings so repeated values share one object
+            for str_field in _INTERNED_CERT_FIELDS:
+                val = cert_get(str_field)
+                if type(val) is str:
+                    cert[str_field] = intern(val)
+
+        # 4. comparison_rank in education_options: must be int (ge=1, le=10)
+        for edu in (plan_get("education_options") or _EMPTY):
+            if type(edu) is dict:
+                _coerce_int_fields(edu, _EDU_INT_RULES)
+
+        # 5. what_to_emphasize in resume bullets: must be string, not list
+        resume_assets = plan_get("resume_assets", {})
+        if type(resume_assets) is dict:
+            for bullet in resume_assets.get("target_role_bullets", []):
+                if type(bullet) is dict:
+                    val = bullet.get("what_to_emphasize")
+                    if type(val) is list:
+                        bullet["what_to_emphasize"] = "; ".join(str(v) for v in val)
+
+        # 7. week_number in twelve_week_plan: must be int (ge=1, le=52)
+        timeline = plan_get("timeline", {})
+        if type(timeline) is dict:
+            for week in timeline.get("twelve_week_plan", []):
+                if type(week) is dict:
+                    val = week.get("week_number")
+                    if type(val) is str:
+                        # Handle "Week 1" format
+                        m = _WEEK_NUM_RE.fullmatch(val)
+                        if m:
+                            week["week_number"] = int(m.group(1))
+
+            # 8. month_number in six_month_plan: must be int (ge=1, le=12)
+            for month in timeline.get("six_month_plan", []):
+                if type(month) is dict:
+                    val = month.get("month_number")
+                    if type(val) is str:
+                        m = _MONTH_NUM_RE.fullmatch(val)
+                        if m:
+                            month["month_number"] = int(m.group(1))
+
+        # 9. profile_summary: truncate if over 1000 chars (schema max)
+        profile_summary = plan_get("profile_summary")
+        if type(profile_summary) is str and len(profile_summary) > 1000:
+            plan_data["profile_summary"] = profile_summary[:997] + "..."
+
+        # Event type rules (12, 18) share one pass over the list
+        for event in (plan_get("events") or _EMPTY):
+            if type(event) is not dict:
+                continue
+            event_get = event.get
+
+            # 12. Booleans in events: beginner_friendly, recurring, virtual_option_available
+            for bool_field in _EVENT_BOOL_FIELDS:
+                val = event_get(bool_field)
+                if type(val) is str:
+                    event[bool_field] = val.lower() in _TRUTHY
+
+            # 18. attendee_count: must be string or None, not int
+            val = event_get("attendee_count")
+            if type(val) in (int, float, bool):  # bool is an int subclass
+                event["attendee_count"] = str(int(val))
+
+        print("✓ Pre-validation type coercions applied (19 rules)")
+
+    except Exception as e:
+        print(f"⚠ Pre-validation coercion error (non-fatal): {e}")
+
+    return fill_plan_defaults(plan_data)
+
+
+def fill_plan_defaults(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply the fixes schema validation can't detect: fallback values for empty
+    optional fields (rules 11, 14-17) and exam_details numbers (rule 13, the
+    dict is untyped). Safe to run on a plan that already validates.
+    Mutates and returns plan_data.
+    """
+    if not plan_data or type(plan_data) is not dict:
+        return plan_data
+
+    plan_get = plan_data.get
+
+    try:
+        # Certification rules (13-15) share one pass over the list
+        for cert in (plan_get("certification_path") or _EMPTY):
+            if type(cert) is not dict:
+                continue
+            cert_get = cert.get
+
+            # 13. exam_details numeric fields: duration_minutes, num_questions as int
+            ed = cert_get("exam_details")
+            if type(ed) is dict:
+                for int_field in ["duration_minutes", "num_questions"]:
+                    val = ed.get(int_field)
+                    if type(val) is str:
+                        ed[int_field] = _to_int(val.replace(",", ""), val)
+
+            # 14. Ensure certifying_body exists on certs (required field)
+            if not cert_get("certifying_body"):
+                cert["certifying_body"] = "Industry Certification Body"
+
+            # 15. Ensure source_citations is a list with at least 1 item where required
+            if not cert_get("source_citations"):
+                cert["source_citations"] = list(_DEFAULT_CERT_CITATIONS)
+            if not cert_get("official_links"):
+                cert["official_links"] = list(_DEFAULT_CERT_LINKS)
+            # Ensure study_materials exists and has at least 1
+            if not cert_get("study_materials"):
+                cert["study_materials"] = [dict(
+                    _DEFAULT_STUDY_MATERIAL,
+                    title=f"{cert_get('name', 'Certification')} Study Guide",
+                    provider=cert_get("certifying_body", "Official"),
+                    description=f"Official study materials for {cert_get('name', 'this certification')}",
+                )]
+
+        # 11. Ensure skills_analysis.can_reframe exists (optional list but Pydantic expects it)
+        sa = plan_get("skills_analysis")
+        if type(sa) is dict:
+            for key in _SKILLS_ANALYSIS_LIST_KEYS:
+                if key not in sa:
+                    sa[key] = []
+
+        # 15. (events) source_citations needs at least 1 item
+        for event in (plan_get("events") or _EMPTY):
+            if type(event) is dict and not event.get("source_citations"):
+                event["source_citations"] = list(_DEFAULT_EVENT_CITATIONS)
+
+        # 16. Ensure research_sources exists at root level
+        if not plan_get("research_sources"):
+            plan_data["research_sources"] = list(_DEFAULT_RESEARCH_SOURCES)
+
+        # 17. Ensure skills_guidance exists with required structure
+        sg = plan_get("skills_guidance")
+        if type(sg) is not dict:
+            plan_data["skills_guidance"] = {
+                "soft_skills": [],
+                "hard_skills": [],
+                "skill_development_strategy": "Focus on building core skills progressively, starting with fundamentals."
+            }
+
+    except Exception as e:
+        print(f"⚠ Plan default fill error (non-fatal): {e}")
+
+    return plan_data
+
+
+def _fix_value(error_type: str, val: Any) -> Any:
+    """Mechanical fix for one invalid value, or _NO_FIX if it needs real content."""
+    if error_type == "string_type":
+        if type(val) is list:
+            return "; ".join(str(v) for v in val)
+        if type(val) in (int, float, bool):
+            return str(val)
+    elif error_type == "list_type":
+        if type(val) in (str, dict):
+            return [val]
+    elif error_type in _INT_ERROR_TYPES:
+        if type(val) is float:
+            return round(val)
+        if type(val) is str:
+            m = _FIRST_NUM_RE.search(val)
+            if m:
+                return int(m.group())
+    elif error_type in _BOOL_ERROR_TYPES:
+        if type(val) is str:
+            return val.strip().lower() in _TRUTHY
+        if type(val) is int:
+            return bool(val)
+    return _NO_FIX
+
+
+def repair_from_errors(plan_data: Dict[str, Any], errors: Iterable[Any]) -> int:
+    """
+    Fix validation errors that don't need new content - scalar/list mismatches,
+    numbers and booleans wrapped in text, forbidden extra keys - at the paths
+    Pydantic reported. Missing fields and too-short lists are left for the LLM
+    repair, which can write realistic values.
+    Mutates plan_data and returns the number of fixes applied.
+    """
+    fixed = 0
+    for err in errors:
+        path = [int(part) if part.isdecimal() else part for part in err.field.split(" -> ")]
+        parent = plan_data
+        try:
+            for key in path[:-1]:
+                parent = parent[key]
+            key = path[-1]
+            if err.expected == "extra_forbidden":
+                del parent[key]
+                fixed += 1
+                continue
+            new_val = _fix_value(err.expected, parent[key])
+        except (KeyError, IndexError, TypeError):
+            # Path doesn't resolve in the raw dict (union/validator locs) - leave it
+            continue
+        if new_val is not _NO_FIX:
+            parent[key] = new_val
+            fixed += 1
+    return fixed
@@ -1,9 +1,12 @@
+import atexit
+import copy
 import logging
 import json
+import queue
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 class StructuredFormatter(logging.Formatter):
@@ -12,7 +15,8 @@ class StructuredFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         # Build structured log entry
         entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # From the record, not now(): records are formatted later on the queue listener thread
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
             "level": record.levelname,
             "message": record.getMessage(),
             "logger": record.name,
@@ -54,12 +58,27 @@ class SimpleFormatter(logging.Formatter):
         )
 
 
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler that keeps exc_info and extras for formatters on the listener thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves this process, so there is no need to pre-format
+        # or drop exc_info like the base class does - only freeze the message.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def setup_logger(name: str = "resume_ai", level: str = "INFO") -> logging.Logger:
     """
     Setup application logger with structured JSON output.
 
     In production (Railway), outputs JSON to stdout for log drain ingestion.
     Optionally writes to file for local development.
+
+    Handlers run on a background QueueListener thread, so logging from request
+    handlers only enqueues the record instead of blocking on stdout/file I/O.
     """
     logger = logging.getLogger(name)
 
@@ -84,7 +103,8 @@ def setup_logger(name: str = "resume_ai", level: str = "INFO") -> logging.Logger
     else:
         console_handler.setFormatter(SimpleFormatter())
 
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
+    file_logging_error = None
 
     # Rotating file handler for local development only
     if not is_production:
@@ -101,10 +121,20 @@ def setup_logger(name: str = "resume_ai", level: str = "INFO") -> logging.Logger
             )
             file_handler.setLevel(logging.DEBUG)
             file_handler.setFormatter(StructuredFormatter())
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
         except Exception as e:
             # Railway has read-only filesystem
-            logger.warning(f"Could not setup file logging: {e}")
+            file_logging_error = e
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_InProcessQueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Drain queued records before the interpreter exits
+    atexit.register(listener.stop)
+
+    if file_logging_error:
+        logger.warning(f"Could not setup file logging: {file_logging_error}")
 
     return logger
 